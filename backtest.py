@@ -10,29 +10,43 @@ Usage:
 
 import argparse
 import json
+import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
 
-from break_and_retest_strategy import is_strong_body
+# Configuration is parsed once, by the strategy module, and shared here
+from break_and_retest_strategy import (
+    CONFIG,
+    REWARD_RISK,
+    SESSION_END_MINUTE,
+    SESSION_START_MINUTE,
+    STOP_BUFFER,
+    detect_breakouts,
+    is_strong_body,
+    minute_of_day,
+)
 
+DEFAULT_TICKERS = CONFIG["tickers"]
 
-def load_config():
-    """Load configuration from config.json"""
-    config_path = Path(__file__).parent / "config.json"
-    if config_path.exists():
-        with open(config_path, "r") as f:
-            return json.load(f)
-    else:
-        # Default config if file doesn't exist
-        return {"tickers": ["AAPL", "AMZN", "META", "MSFT", "NVDA", "TSLA", "SPOT", "UBER"]}
+# Relaxed setup thresholds for backtesting (the live scanner's are stricter)
+BACKTEST_BREAKOUT_VOLUME_FACTOR = 1.0  # breakout volume vs. 5m volume MA
+BACKTEST_RETEST_TOLERANCE = 0.5  # max distance ($) between 1m re-test wick and the level
+BACKTEST_RETEST_RANGE_RATIO = 0.75  # 1m re-test range vs. 5m breakout range
+BACKTEST_RETEST_VOLUME_TOLERANCE = 1.5  # 1m re-test volume vs. per-minute breakout volume
 
 
-CONFIG = load_config()
-DEFAULT_TICKERS = CONFIG["tickers"]
+def _yfinance_ticker(symbol: str):
+    """Create a yfinance Ticker, importing yfinance lazily (slow to import and only
+    needed when the cache misses)."""
+    import yfinance as yf
+
+    return yf.Ticker(symbol)
 
 
 class DataCache:
@@ -44,9 +58,7 @@ class DataCache:
 
     def _get_cache_path(self, symbol: str, date: str, interval: str) -> Path:
         """Generate cache file path for a symbol and date"""
-        symbol_dir = self.cache_dir / symbol
-        symbol_dir.mkdir(exist_ok=True)
-        return symbol_dir / f"{date}_{interval}.csv"
+        return self.cache_dir / symbol / f"{date}_{interval}.csv"
 
     def get_cached_data(self, symbol: str, date: str, interval: str) -> Optional[pd.DataFrame]:
         """Load cached data if available"""
@@ -59,6 +71,8 @@ class DataCache:
     def cache_data(self, symbol: str, date: str, interval: str, df: pd.DataFrame):
         """Save data to cache"""
         cache_path = self._get_cache_path(symbol, date, interval)
+        # Symbol directories are only created on write, so cache lookups stay read-only
+        cache_path.parent.mkdir(exist_ok=True)
         df.to_csv(cache_path, index=False)
 
     def download_data(
@@ -93,6 +107,7 @@ class DataCache:
             return self._download_1m_data(symbol, start, end, force_refresh)
 
         # Download day by day for intraday data (yfinance limitation)
+        ticker = None
         current = start
         while current <= end:
             date_str = current.strftime("%Y-%m-%d")
@@ -105,9 +120,12 @@ class DataCache:
                     current += timedelta(days=1)
                     continue
 
-            # Download from yfinance
+            # Download from yfinance; the Ticker is created on the first miss and reused.
+            # Created outside the try so a missing yfinance raises instead of being
+            # reported (and retried) as a per-day download error.
+            if ticker is None:
+                ticker = _yfinance_ticker(symbol)
             try:
-                ticker = yf.Ticker(symbol)
                 next_day = current + timedelta(days=1)
                 df = ticker.history(
                     start=current.strftime("%Y-%m-%d"),
@@ -172,6 +190,7 @@ class DataCache:
         all_data = []
 
         # Download in 7-day chunks
+        ticker = None
         current = start
         while current <= end:
             chunk_end = min(current + timedelta(days=7), end + timedelta(days=1))
@@ -187,9 +206,12 @@ class DataCache:
                     current = chunk_end
                     continue
 
-            # Download from yfinance
+            # Download from yfinance; the Ticker is created on the first miss and reused.
+            # Created outside the try so a missing yfinance raises instead of being
+            # reported (and retried) as a per-day download error.
+            if ticker is None:
+                ticker = _yfinance_ticker(symbol)
             try:
-                ticker = yf.Ticker(symbol)
                 df = ticker.history(
                     start=current.strftime("%Y-%m-%d"),
                     end=chunk_end.strftime("%Y-%m-%d"),
@@ -288,36 +310,35 @@ class BacktestEngine:
         """
         all_signals = []
 
-        # Calculate 20-bar volume MA on 5-minute data
-        df_5m = df_5m.copy()
-        df_5m["vol_ma"] = df_5m["Volume"].rolling(window=20, min_periods=1).mean()
-        df_5m["Date"] = df_5m["Datetime"].dt.date
+        # Calculate 20-bar volume MA on 5-minute data (assign leaves the caller's frame
+        # untouched without copying the OHLCV columns up front)
+        df_5m = df_5m.assign(
+            vol_ma=df_5m["Volume"].rolling(window=20, min_periods=1).mean(),
+            Date=df_5m["Datetime"].dt.normalize(),
+        )
 
-        # Prepare 1-minute data
-        df_1m = df_1m.copy()
-        df_1m["Date"] = df_1m["Datetime"].dt.date
+        # Prepare 1-minute data, sorted by time so retest windows can be sliced by position
+        df_1m = df_1m.sort_values("Datetime", kind="stable")
+        df_1m["Date"] = df_1m["Datetime"].dt.normalize()
 
         trading_days = df_5m["Date"].unique()
 
-        for day in trading_days:
-            # Get 5-minute data for this day during market hours (09:30-16:00)
-            day_df_5m = df_5m[df_5m["Date"] == day].copy()
-            session_df_5m = day_df_5m[
-                (day_df_5m["Datetime"].dt.strftime("%H:%M") >= "09:30")
-                & (day_df_5m["Datetime"].dt.strftime("%H:%M") < "16:00")
-            ]
+        # Restrict both timeframes to market hours (09:30-16:00) once, up front
+        minute_5m = minute_of_day(df_5m["Datetime"])
+        session_5m = df_5m[(minute_5m >= SESSION_START_MINUTE) & (minute_5m < SESSION_END_MINUTE)]
+        minute_1m = minute_of_day(df_1m["Datetime"])
+        session_1m = df_1m[(minute_1m >= SESSION_START_MINUTE) & (minute_1m < SESSION_END_MINUTE)]
 
-            if len(session_df_5m) < 10:
-                continue
+        # Split each timeframe into per-day sessions in one pass rather than masking the
+        # whole frame once per day
+        sessions_5m = dict(tuple(session_5m.groupby("Date", sort=False)))
+        sessions_1m = dict(tuple(session_1m.groupby("Date", sort=False)))
 
-            # Get 1-minute data for this day
-            day_df_1m = df_1m[df_1m["Date"] == day].copy()
-            session_df_1m = day_df_1m[
-                (day_df_1m["Datetime"].dt.strftime("%H:%M") >= "09:30")
-                & (day_df_1m["Datetime"].dt.strftime("%H:%M") < "16:00")
-            ]
+        for day in trading_days:
+            # Get 5-minute data for this day during market hours
+            session_df_5m = sessions_5m.get(day)
 
-            if len(session_df_1m) < 50:
+            if session_df_5m is None or len(session_df_5m) < 10:
                 continue
 
             # Use first 5-minute candle as opening range
@@ -329,111 +350,124 @@ class BacktestEngine:
             end_time = start_time + timedelta(minutes=90)
             scan_df_5m = session_df_5m[
                 (session_df_5m["Datetime"] >= start_time) & (session_df_5m["Datetime"] < end_time)
-            ].copy()
+            ]
 
             if len(scan_df_5m) < 10:
                 continue
 
-            # Look for breakouts on 5-minute timeframe
-            for i in range(1, len(scan_df_5m)):
-                row_5m = scan_df_5m.iloc[i]
-                prev_5m = scan_df_5m.iloc[i - 1]
-
-                breakout_up = (
-                    prev_5m["High"] <= or_high
-                    and row_5m["High"] > or_high
-                    and is_strong_body(row_5m)
-                    and row_5m["Volume"] > row_5m["vol_ma"] * 1.0
-                    and row_5m["Close"] > or_high
+            # Cheap prefilter: a breakout needs a bar trading through the opening range,
+            # so skip the day's 1-minute work entirely when no bar does
+            after_open = scan_df_5m.iloc[1:]
+            if not ((after_open["High"] > or_high).any() or (after_open["Low"] < or_low).any()):
+                continue
+
+            # Get 1-minute data for this day during market hours
+            session_df_1m = sessions_1m.get(day)
+
+            if session_df_1m is None or len(session_df_1m) < 50:
+                continue
+
+            # Pull the 1-minute columns out as arrays once per day; the retest/ignition
+            # loop below indexes these directly instead of materialising a row per bar
+            datetimes_1m = session_df_1m["Datetime"]
+            highs_1m = session_df_1m["High"].to_numpy()
+            lows_1m = session_df_1m["Low"].to_numpy()
+            volumes_1m = session_df_1m["Volume"].to_numpy()
+            strong_1m = is_strong_body(session_df_1m).to_numpy()
+
+            # Look for breakouts on 5-minute timeframe: evaluate the breakout conditions
+            # for the whole window at once and only visit the bars that qualify
+            highs_5m = scan_df_5m["High"].to_numpy()
+            lows_5m = scan_df_5m["Low"].to_numpy()
+            volumes_5m = scan_df_5m["Volume"].to_numpy()
+            # Retest/ignition happen on 1-minute bars, so late 5m breakouts still count
+            breakouts_up, breakouts_down = detect_breakouts(
+                scan_df_5m,
+                or_high,
+                or_low,
+                volume_factor=BACKTEST_BREAKOUT_VOLUME_FACTOR,
+                exclude_tail=False,
+            )
+
+            for i in np.flatnonzero(breakouts_up | breakouts_down):
+                breakout_up = bool(breakouts_up[i])
+
+                # Breakout detected on 5-minute! Now switch to 1-minute for retest/ignition
+                breakout_time = scan_df_5m["Datetime"].iloc[i]
+                breakout_level = or_high if breakout_up else or_low
+                breakout_range = highs_5m[i] - lows_5m[i]
+                breakout_volume = volumes_5m[i]
+
+                # Get 1-minute candles starting from the breakout candle time
+                # Look ahead up to 30 minutes for retest + ignition pattern
+                # (binary search on the sorted times instead of masking the whole session)
+                retest_window_end = breakout_time + timedelta(minutes=30)
+                window_start = datetimes_1m.searchsorted(breakout_time, side="right")
+                window_stop = datetimes_1m.searchsorted(retest_window_end, side="right")
+
+                if window_stop - window_start < 3:
+                    continue
+
+                # Look for retest + ignition pattern on 1-minute timeframe: evaluate every
+                # (retest, next-bar ignition) pair in the window at once and take the first
+                retest = slice(window_start, window_stop - 1)
+                ignite = slice(window_start + 1, window_stop)
+                retest_highs = highs_1m[retest]
+                retest_lows = lows_1m[retest]
+                retest_volumes = volumes_1m[retest]
+
+                if breakout_up:
+                    # Retest comes back to the level from above, ignition breaks its high
+                    returns_to_level = (
+                        np.abs(retest_lows - breakout_level) < BACKTEST_RETEST_TOLERANCE
+                    )
+                    breaks_retest = highs_1m[ignite] > retest_highs
+                else:
+                    # Retest comes back to the level from below, ignition breaks its low
+                    returns_to_level = (
+                        np.abs(retest_highs - breakout_level) < BACKTEST_RETEST_TOLERANCE
+                    )
+                    breaks_retest = lows_1m[ignite] < retest_lows
+
+                # Tight candle (smaller range than 5m breakout) on lower volume
+                # (compare 1m to 5m average: 5m vol / 5 bars, with 1.5x tolerance)
+                tight_candle = (
+                    retest_highs - retest_lows < BACKTEST_RETEST_RANGE_RATIO * breakout_range
                 )
-                breakout_down = (
-                    prev_5m["Low"] >= or_low
-                    and row_5m["Low"] < or_low
-                    and is_strong_body(row_5m)
-                    and row_5m["Volume"] > row_5m["vol_ma"] * 1.0
-                    and row_5m["Close"] < or_low
+                lower_vol = (
+                    retest_volumes < (breakout_volume / 5) * BACKTEST_RETEST_VOLUME_TOLERANCE
                 )
 
-                if breakout_up or breakout_down:
-                    # Breakout detected on 5-minute! Now switch to 1-minute for retest/ignition
-                    breakout_time = row_5m["Datetime"]
-                    breakout_level = or_high if breakout_up else or_low
-
-                    # Get 1-minute candles starting from the breakout candle time
-                    # Look ahead up to 30 minutes for retest + ignition pattern
-                    retest_window_end = breakout_time + timedelta(minutes=30)
-                    df_1m_window = session_df_1m[
-                        (session_df_1m["Datetime"] > breakout_time)
-                        & (session_df_1m["Datetime"] <= retest_window_end)
-                    ].copy()
-
-                    if len(df_1m_window) < 3:
-                        continue
-
-                    # Look for retest + ignition pattern on 1-minute timeframe
-                    for j in range(len(df_1m_window) - 1):
-                        retest_1m = df_1m_window.iloc[j]
-
-                        # Check if this candle retests the level
-                        returns_to_level = (
-                            breakout_up and abs(retest_1m["Low"] - breakout_level) < 0.5
-                        ) or (breakout_down and abs(retest_1m["High"] - breakout_level) < 0.5)
-
-                        # Check if it's a tight candle (smaller range than 5m breakout)
-                        tight_candle = retest_1m["High"] - retest_1m["Low"] < 0.75 * (
-                            row_5m["High"] - row_5m["Low"]
-                        )
+                # Ignition: strong body, breaks above/below retest, volume increases
+                ignition = strong_1m[ignite] & breaks_retest & (volumes_1m[ignite] > retest_volumes)
 
-                        # Volume should be lower than breakout (compare 1m to 5m average)
-                        lower_vol = (
-                            retest_1m["Volume"] < (row_5m["Volume"] / 5) * 1.5
-                        )  # 5m vol / 5 bars, with 1.5x tolerance
-
-                        if returns_to_level and tight_candle and lower_vol:
-                            # Found retest! Now look for ignition on next 1-minute candle
-                            if j + 1 >= len(df_1m_window):
-                                break
-
-                            ign_1m = df_1m_window.iloc[j + 1]
-
-                            # Ignition: strong body, breaks above/below retest, volume increases
-                            ignition = (
-                                is_strong_body(ign_1m)
-                                and (
-                                    (breakout_up and ign_1m["High"] > retest_1m["High"])
-                                    or (breakout_down and ign_1m["Low"] < retest_1m["Low"])
-                                )
-                                and ign_1m["Volume"] > retest_1m["Volume"]
-                            )
-
-                            if ignition:
-                                entry = ign_1m["High"] if breakout_up else ign_1m["Low"]
-                                stop = (
-                                    retest_1m["Low"] - 0.05
-                                    if breakout_up
-                                    else retest_1m["High"] + 0.05
-                                )
-                                risk = abs(entry - stop)
-                                target = entry + 2 * risk if breakout_up else entry - 2 * risk
-
-                                all_signals.append(
-                                    {
-                                        "direction": "long" if breakout_up else "short",
-                                        "entry": entry,
-                                        "stop": stop,
-                                        "target": target,
-                                        "risk": risk,
-                                        "vol_breakout_5m": row_5m["Volume"],
-                                        "vol_retest_1m": retest_1m["Volume"],
-                                        "vol_ignition_1m": ign_1m["Volume"],
-                                        "datetime": ign_1m["Datetime"],
-                                        "breakout_time_5m": breakout_time,
-                                        "level": breakout_level,
-                                    }
-                                )
-
-                                # Only take first signal per breakout
-                                break
+                setups = np.flatnonzero(returns_to_level & tight_candle & lower_vol & ignition)
+                if len(setups) == 0:
+                    continue
+
+                # Only take first signal per breakout
+                k = window_start + setups[0]
+                ign = k + 1
+                entry = highs_1m[ign] if breakout_up else lows_1m[ign]
+                stop = lows_1m[k] - STOP_BUFFER if breakout_up else highs_1m[k] + STOP_BUFFER
+                risk = abs(entry - stop)
+                target = entry + REWARD_RISK * risk if breakout_up else entry - REWARD_RISK * risk
+
+                all_signals.append(
+                    {
+                        "direction": "long" if breakout_up else "short",
+                        "entry": entry,
+                        "stop": stop,
+                        "target": target,
+                        "risk": risk,
+                        "vol_breakout_5m": breakout_volume,
+                        "vol_retest_1m": volumes_1m[k],
+                        "vol_ignition_1m": volumes_1m[ign],
+                        "datetime": datetimes_1m.iloc[ign],
+                        "breakout_time_5m": breakout_time,
+                        "level": breakout_level,
+                    }
+                )
 
         return all_signals
 
@@ -464,6 +498,9 @@ class BacktestEngine:
             }
 
         trades = []
+        # Statistics are accumulated while trades are produced (single pass)
+        winning_trades = 0
+        total_pnl = 0
 
         for sig in signals:
             # Simulate trade execution
@@ -485,24 +522,12 @@ class BacktestEngine:
             # For now, use a 50/50 random outcome weighted by risk/reward
 
             # Simulate outcome (simplified - assumes 60% hit target based on 2:1 R:R)
-            import random
-
             hit_target = random.random() < 0.6
 
-            if hit_target:
-                exit_price = target_price
-                pnl = (
-                    (exit_price - entry_price) * shares
-                    if direction == "long"
-                    else (entry_price - exit_price) * shares
-                )
-            else:
-                exit_price = stop_price
-                pnl = (
-                    (exit_price - entry_price) * shares
-                    if direction == "long"
-                    else (entry_price - exit_price) * shares
-                )
+            exit_price = target_price if hit_target else stop_price
+            # Shorts profit when price falls: flip the sign of the price move
+            direction_sign = 1 if direction == "long" else -1
+            pnl = direction_sign * (exit_price - entry_price) * shares
 
             trades.append(
                 {
@@ -517,12 +542,13 @@ class BacktestEngine:
                     "outcome": "win" if hit_target else "loss",
                 }
             )
+            if hit_target:
+                winning_trades += 1
+            total_pnl += pnl
 
         # Calculate statistics
         total_trades = len(trades)
-        winning_trades = sum(1 for t in trades if t["outcome"] == "win")
         losing_trades = total_trades - winning_trades
-        total_pnl = sum(t["pnl"] for t in trades)
         win_rate = winning_trades / total_trades if total_trades > 0 else 0
 
         return {
@@ -537,6 +563,75 @@ class BacktestEngine:
         }
 
 
+def run_symbol_backtest(
+    symbol: str,
+    start_date: str,
+    end_date: str,
+    cache_dir: str = "cache",
+    force_refresh: bool = False,
+    initial_capital: float = 10000,
+    position_size_pct: float = 0.1,
+) -> Optional[Dict]:
+    """
+    Load 5m/1m data for a single symbol and run the backtest on it
+
+    Kept at module level so it can be dispatched to worker processes; each
+    call builds its own DataCache and BacktestEngine.
+
+    Args:
+        symbol: Stock ticker
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        cache_dir: Cache directory path
+        force_refresh: If True, ignore cache and re-download
+        initial_capital: Starting capital
+        position_size_pct: Percentage of capital per trade (0.1 = 10%)
+
+    Returns:
+        Backtest result dictionary, or None if 5m or 1m data is unavailable
+    """
+    print(f"\n{'='*60}")
+    print(f"Backtesting {symbol}")
+    print(f"{'='*60}")
+
+    cache = DataCache(cache_dir)
+    engine = BacktestEngine(initial_capital=initial_capital, position_size_pct=position_size_pct)
+
+    # Download/load 5-minute data
+    print("Downloading 5-minute data...")
+    df_5m = cache.download_data(
+        symbol=symbol,
+        start_date=start_date,
+        end_date=end_date,
+        interval="5m",
+        force_refresh=force_refresh,
+    )
+
+    if df_5m.empty:
+        print(f"No 5-minute data available for {symbol}")
+        return None
+
+    print(f"Loaded {len(df_5m)} 5-minute bars for {symbol}")
+
+    # Download/load 1-minute data
+    print("Downloading 1-minute data...")
+    df_1m = cache.download_data(
+        symbol=symbol,
+        start_date=start_date,
+        end_date=end_date,
+        interval="1m",
+        force_refresh=force_refresh,
+    )
+
+    if df_1m.empty:
+        print(f"No 1-minute data available for {symbol}")
+        return None
+
+    print(f"Loaded {len(df_1m)} 1-minute bars for {symbol}")
+
+    return engine.run_backtest(symbol, df_5m, df_1m)
+
+
 def format_results(results: List[Dict]) -> str:
     """Format backtest results for display"""
     output = []
@@ -613,6 +708,12 @@ Default tickers from config.json: {', '.join(DEFAULT_TICKERS)}
     parser.add_argument("--cache-dir", default="cache", help="Cache directory (default: cache)")
     parser.add_argument("--force-refresh", action="store_true", help="Force refresh cached data")
     parser.add_argument("--output", help="Output JSON file for results")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for per-symbol backtests (default: 1)",
+    )
 
     args = parser.parse_args()
 
@@ -624,55 +725,25 @@ Default tickers from config.json: {', '.join(DEFAULT_TICKERS)}
     print(f"Initial capital: ${args.initial_capital:,.2f}")
     print()
 
-    # Initialize components
-    cache = DataCache(args.cache_dir)
-    engine = BacktestEngine(
-        initial_capital=args.initial_capital, position_size_pct=args.position_size
+    run_one = partial(
+        run_symbol_backtest,
+        start_date=args.start,
+        end_date=args.end,
+        cache_dir=args.cache_dir,
+        force_refresh=args.force_refresh,
+        initial_capital=args.initial_capital,
+        position_size_pct=args.position_size,
     )
 
-    results = []
-
-    # Run backtest for each symbol
-    for symbol in symbols:
-        print(f"\n{'='*60}")
-        print(f"Backtesting {symbol}")
-        print(f"{'='*60}")
-
-        # Download/load 5-minute data
-        print("Downloading 5-minute data...")
-        df_5m = cache.download_data(
-            symbol=symbol,
-            start_date=args.start,
-            end_date=args.end,
-            interval="5m",
-            force_refresh=args.force_refresh,
-        )
-
-        if df_5m.empty:
-            print(f"No 5-minute data available for {symbol}")
-            continue
-
-        print(f"Loaded {len(df_5m)} 5-minute bars for {symbol}")
-
-        # Download/load 1-minute data
-        print("Downloading 1-minute data...")
-        df_1m = cache.download_data(
-            symbol=symbol,
-            start_date=args.start,
-            end_date=args.end,
-            interval="1m",
-            force_refresh=args.force_refresh,
-        )
-
-        if df_1m.empty:
-            print(f"No 1-minute data available for {symbol}")
-            continue
-
-        print(f"Loaded {len(df_1m)} 1-minute bars for {symbol}")
+    # Run backtest for each symbol; symbols are independent, so they can be
+    # spread across worker processes (output from workers may interleave)
+    if args.workers > 1 and len(symbols) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            per_symbol = list(executor.map(run_one, symbols))
+    else:
+        per_symbol = [run_one(symbol) for symbol in symbols]
 
-        # Run backtest
-        result = engine.run_backtest(symbol, df_5m, df_1m)
-        results.append(result)
+    results = [res for res in per_symbol if res is not None]
 
     # Display results
     print(format_results(results))
@@ -16,19 +16,19 @@ import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
 
 DEFAULT_RETRIES = 3
 DEFAULT_RETRY_DELAY = 1.0  # seconds
+CONFIG_PATH = Path(__file__).parent / "config.json"
 
 
 # Load configuration
 def load_config():
     """Load configuration from config.json"""
-    config_path = Path(__file__).parent / "config.json"
-    if config_path.exists():
-        with open(config_path, "r") as f:
+    if CONFIG_PATH.exists():
+        with open(CONFIG_PATH, "r") as f:
             return json.load(f)
     else:
         # Default config if file doesn't exist
@@ -51,7 +51,35 @@ SESSION_END = CONFIG["session_end"]
 MARKET_OPEN_MINUTES = CONFIG["market_open_minutes"]
 
 
+def _hhmm_to_minute(hhmm):
+    """Convert an "HH:MM" string to minutes after midnight."""
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+# Session bounds as minute-of-day integers, for vectorized session filtering
+SESSION_START_MINUTE = _hhmm_to_minute(SESSION_START)
+SESSION_END_MINUTE = _hhmm_to_minute(SESSION_END)
+
+# Setup thresholds shared by the scanners
+STRONG_BODY_RATIO = 0.6  # candle body must be >= 60% of its range
+BREAKOUT_VOLUME_FACTOR = 1.2  # breakout volume vs. rolling volume MA
+RETEST_TOLERANCE = 0.1  # max distance ($) between re-test wick and the level
+RETEST_RANGE_RATIO = 0.5  # re-test range must be < 50% of the breakout range
+STOP_BUFFER = 0.05  # stop placed this far ($) beyond the re-test candle
+REWARD_RISK = 2  # target distance as a multiple of risk
+
+
 # --- Helper Functions ---
+def minute_of_day(datetimes):
+    """Minutes after midnight for a datetime Series.
+
+    Compares as integers against SESSION_START_MINUTE/SESSION_END_MINUTE, avoiding
+    formatting every timestamp to an "HH:MM" string.
+    """
+    return datetimes.dt.hour * 60 + datetimes.dt.minute
+
+
 def get_intraday_data(
     ticker,
     retries=DEFAULT_RETRIES,
@@ -62,9 +90,12 @@ def get_intraday_data(
     """Download intraday data with simple retry/backoff.
 
     Returns a DataFrame (may be empty).
-    Always returns a DataFrame (possibly empty) instead of raising so
-    callers can handle missing data.
+    Download failures return a DataFrame (possibly empty) instead of raising so
+    callers can handle missing data. A missing yfinance install raises ImportError.
     """
+    # Imported lazily: yfinance is slow to import and only needed for live downloads
+    import yfinance as yf
+
     attempt = 0
     last_exc = None
     while attempt < retries:
@@ -93,7 +124,7 @@ def get_intraday_data(
 
 def find_premarket_high(df):
     # Premarket: before 09:30
-    premarket = df[df["Datetime"].dt.strftime("%H:%M") < SESSION_START]
+    premarket = df[minute_of_day(df["Datetime"]) < SESSION_START_MINUTE]
     if len(premarket) == 0:
         return None
     return premarket["High"].max()
@@ -101,7 +132,7 @@ def find_premarket_high(df):
 
 def find_first_candle_range(df):
     # Find first 5-min candle after market open (09:30)
-    session = df[df["Datetime"].dt.strftime("%H:%M") >= SESSION_START]
+    session = df[minute_of_day(df["Datetime"]) >= SESSION_START_MINUTE]
     if len(session) == 0:
         return None, None
     first_candle = session.iloc[0]
@@ -111,7 +142,46 @@ def find_first_candle_range(df):
 def is_strong_body(row):
     body = abs(row["Close"] - row["Open"])
     range_ = row["High"] - row["Low"]
-    return body >= 0.6 * range_  # strong body: >=60% of range
+    return body >= STRONG_BODY_RATIO * range_
+
+
+def detect_breakouts(
+    scan_df, lvl_high, lvl_low, volume_factor=BREAKOUT_VOLUME_FACTOR, exclude_tail=True
+):
+    """Flag breakout candles across the whole scan window at once.
+
+    Expects scan_df to carry a vol_ma column. Returns (breakouts_up, breakouts_down)
+    boolean arrays aligned with scan_df rows. The first bar is never flagged; with
+    exclude_tail, neither are the last two bars (which have no room for a re-test and
+    ignition on the same timeframe).
+    """
+    highs = scan_df["High"].to_numpy()
+    lows = scan_df["Low"].to_numpy()
+    closes = scan_df["Close"].to_numpy()
+    strong = is_strong_body(scan_df).to_numpy()
+    above_avg_vol = (scan_df["Volume"] > scan_df["vol_ma"] * volume_factor).to_numpy()
+
+    breakouts_up = np.zeros(len(scan_df), dtype=bool)
+    breakouts_down = np.zeros(len(scan_df), dtype=bool)
+    breakouts_up[1:] = (
+        (highs[:-1] <= lvl_high)
+        & (highs[1:] > lvl_high)
+        & strong[1:]
+        & above_avg_vol[1:]
+        & (closes[1:] > lvl_high)
+    )
+    breakouts_down[1:] = (
+        (lows[:-1] >= lvl_low)
+        & (lows[1:] < lvl_low)
+        & strong[1:]
+        & above_avg_vol[1:]
+        & (closes[1:] < lvl_low)
+    )
+    if exclude_tail:
+        tail = max(len(scan_df) - 2, 0)
+        breakouts_up[tail:] = False
+        breakouts_down[tail:] = False
+    return breakouts_up, breakouts_down
 
 
 def scan_ticker(
@@ -137,12 +207,12 @@ def scan_ticker(
         print(f"{ticker}: No opening range found.")
         return [], df
     # Restrict detection to first 90 min after open
-    session = df[df["Datetime"].dt.strftime("%H:%M") >= SESSION_START]
+    session = df[minute_of_day(df["Datetime"]) >= SESSION_START_MINUTE]
     if len(session) == 0:
         print(f"{ticker}: No session data.")
         return [], df
     start_time = session["Datetime"].iloc[0]
-    end_time = start_time + timedelta(minutes=MARKET_OPEN_MINUTES)
+    end_time = start_time + timedelta(minutes=market_open_minutes)
     scan_df = session[(session["Datetime"] >= start_time) & (session["Datetime"] < end_time)].copy()
     if len(scan_df) < 10:
         print(f"{ticker}: Not enough data in first {market_open_minutes} min.")
@@ -153,74 +223,59 @@ def scan_ticker(
     lvl_high = or_high
     lvl_low = or_low
     # --- 1. Breakout Detection ---
-    for i in range(1, len(scan_df) - 2):
+    # Breakout up breaks the opening range high, breakout down breaks the low;
+    # only the flagged bars go on to the re-test/ignition checks
+    breakouts_up, breakouts_down = detect_breakouts(scan_df, lvl_high, lvl_low)
+    for i in np.flatnonzero(breakouts_up | breakouts_down):
         row = scan_df.iloc[i]
-        prev = scan_df.iloc[i - 1]
-        # Breakout up: breaks opening range high
-        breakout_up = (
-            prev["High"] <= lvl_high
-            and row["High"] > lvl_high
-            and is_strong_body(row)
-            and row["Volume"] > row["vol_ma"] * 1.2
-            and row["Close"] > lvl_high
+        breakout_up = bool(breakouts_up[i])
+        breakout_down = bool(breakouts_down[i])
+        # --- 2. Re-Test Detection ---
+        re_test = scan_df.iloc[i + 1]
+        # Price returns to level
+        returns_to_level = (breakout_up and abs(re_test["Low"] - lvl_high) < RETEST_TOLERANCE) or (
+            breakout_down and abs(re_test["High"] - lvl_low) < RETEST_TOLERANCE
         )
-        # Breakout down: breaks opening range low
-        breakout_down = (
-            prev["Low"] >= lvl_low
-            and row["Low"] < lvl_low
-            and is_strong_body(row)
-            and row["Volume"] > row["vol_ma"] * 1.2
-            and row["Close"] < lvl_low
+        # Tight candle, lower volume
+        tight_candle = re_test["High"] - re_test["Low"] < RETEST_RANGE_RATIO * (
+            row["High"] - row["Low"]
         )
-        if breakout_up or breakout_down:
-            # --- 2. Re-Test Detection ---
-            re_test_idx = i + 1
-            if re_test_idx >= len(scan_df):
-                continue
-            re_test = scan_df.iloc[re_test_idx]
-            # Price returns to level
-            returns_to_level = (breakout_up and abs(re_test["Low"] - lvl_high) < 0.1) or (
-                breakout_down and abs(re_test["High"] - lvl_low) < 0.1
+        lower_vol = re_test["Volume"] < row["Volume"]
+        if returns_to_level and tight_candle and lower_vol:
+            # --- 3. Ignition Candle ---
+            ign = scan_df.iloc[i + 2]
+            # Strong body, breaks re-test high/low, volume increases
+            ignition = (
+                is_strong_body(ign)
+                and (
+                    (breakout_up and ign["High"] > re_test["High"])
+                    or (breakout_down and ign["Low"] < re_test["Low"])
+                )
+                and ign["Volume"] > re_test["Volume"]
             )
-            # Tight candle, lower volume
-            tight_candle = re_test["High"] - re_test["Low"] < 0.5 * (row["High"] - row["Low"])
-            lower_vol = re_test["Volume"] < row["Volume"]
-            if returns_to_level and tight_candle and lower_vol:
-                # --- 3. Ignition Candle ---
-                ign_idx = i + 2
-                if ign_idx >= len(scan_df):
-                    continue
-                ign = scan_df.iloc[ign_idx]
-                # Strong body, breaks re-test high/low, volume increases
-                ignition = (
-                    is_strong_body(ign)
-                    and (
-                        (breakout_up and ign["High"] > re_test["High"])
-                        or (breakout_down and ign["Low"] < re_test["Low"])
-                    )
-                    and ign["Volume"] > re_test["Volume"]
+            if ignition:
+                # --- 4. Entry, Stop, Target ---
+                entry = ign["High"] if breakout_up else ign["Low"]
+                stop = (
+                    re_test["Low"] - STOP_BUFFER if breakout_up else re_test["High"] + STOP_BUFFER
+                )
+                risk = abs(entry - stop)
+                target = entry + REWARD_RISK * risk if breakout_up else entry - REWARD_RISK * risk
+                signals.append(
+                    {
+                        "ticker": ticker,
+                        "datetime": ign["Datetime"],
+                        "direction": "long" if breakout_up else "short",
+                        "level": lvl_high if breakout_up else lvl_low,
+                        "entry": entry,
+                        "stop": stop,
+                        "target": target,
+                        "risk": risk,
+                        "vol_breakout": row["Volume"],
+                        "vol_retest": re_test["Volume"],
+                        "vol_ignition": ign["Volume"],
+                    }
                 )
-                if ignition:
-                    # --- 4. Entry, Stop, Target ---
-                    entry = ign["High"] if breakout_up else ign["Low"]
-                    stop = re_test["Low"] - 0.05 if breakout_up else re_test["High"] + 0.05
-                    risk = abs(entry - stop)
-                    target = entry + 2 * risk if breakout_up else entry - 2 * risk
-                    signals.append(
-                        {
-                            "ticker": ticker,
-                            "datetime": ign["Datetime"],
-                            "direction": "long" if breakout_up else "short",
-                            "level": lvl_high if breakout_up else lvl_low,
-                            "entry": entry,
-                            "stop": stop,
-                            "target": target,
-                            "risk": risk,
-                            "vol_breakout": row["Volume"],
-                            "vol_retest": re_test["Volume"],
-                            "vol_ignition": ign["Volume"],
-                        }
-                    )
     # --- Print Results ---
     if signals:
         for sig in signals:
@@ -257,7 +312,7 @@ def scan_dataframe(df, market_open_minutes=MARKET_OPEN_MINUTES):
     df = df.copy()
     df["Datetime"] = pd.to_datetime(df["Datetime"])
     # Use first 5-min candle after market open as range
-    session = df[df["Datetime"].dt.strftime("%H:%M") >= SESSION_START]
+    session = df[minute_of_day(df["Datetime"]) >= SESSION_START_MINUTE]
     if len(session) == 0:
         return [], pd.DataFrame()
     or_high, or_low = None, None
@@ -275,65 +330,50 @@ def scan_dataframe(df, market_open_minutes=MARKET_OPEN_MINUTES):
     signals = []
     lvl_high = or_high
     lvl_low = or_low
-    for i in range(1, len(scan_df) - 2):
+    breakouts_up, breakouts_down = detect_breakouts(scan_df, lvl_high, lvl_low)
+    for i in np.flatnonzero(breakouts_up | breakouts_down):
         row = scan_df.iloc[i]
-        prev = scan_df.iloc[i - 1]
-        breakout_up = (
-            prev["High"] <= lvl_high
-            and row["High"] > lvl_high
-            and is_strong_body(row)
-            and row["Volume"] > row["vol_ma"] * 1.2
-            and row["Close"] > lvl_high
+        breakout_up = bool(breakouts_up[i])
+        breakout_down = bool(breakouts_down[i])
+        re_test = scan_df.iloc[i + 1]
+        returns_to_level = (breakout_up and abs(re_test["Low"] - lvl_high) < RETEST_TOLERANCE) or (
+            breakout_down and abs(re_test["High"] - lvl_low) < RETEST_TOLERANCE
         )
-        breakout_down = (
-            prev["Low"] >= lvl_low
-            and row["Low"] < lvl_low
-            and is_strong_body(row)
-            and row["Volume"] > row["vol_ma"] * 1.2
-            and row["Close"] < lvl_low
+        tight_candle = re_test["High"] - re_test["Low"] < RETEST_RANGE_RATIO * (
+            row["High"] - row["Low"]
         )
-        if breakout_up or breakout_down:
-            re_test_idx = i + 1
-            if re_test_idx >= len(scan_df):
-                continue
-            re_test = scan_df.iloc[re_test_idx]
-            returns_to_level = (breakout_up and abs(re_test["Low"] - lvl_high) < 0.1) or (
-                breakout_down and abs(re_test["High"] - lvl_low) < 0.1
+        lower_vol = re_test["Volume"] < row["Volume"]
+        if returns_to_level and tight_candle and lower_vol:
+            ign = scan_df.iloc[i + 2]
+            ignition = (
+                is_strong_body(ign)
+                and (
+                    (breakout_up and ign["High"] > re_test["High"])
+                    or (breakout_down and ign["Low"] < re_test["Low"])
+                )
+                and ign["Volume"] > re_test["Volume"]
             )
-            tight_candle = re_test["High"] - re_test["Low"] < 0.5 * (row["High"] - row["Low"])
-            lower_vol = re_test["Volume"] < row["Volume"]
-            if returns_to_level and tight_candle and lower_vol:
-                ign_idx = i + 2
-                if ign_idx >= len(scan_df):
-                    continue
-                ign = scan_df.iloc[ign_idx]
-                ignition = (
-                    is_strong_body(ign)
-                    and (
-                        (breakout_up and ign["High"] > re_test["High"])
-                        or (breakout_down and ign["Low"] < re_test["Low"])
-                    )
-                    and ign["Volume"] > re_test["Volume"]
+            if ignition:
+                entry = ign["High"] if breakout_up else ign["Low"]
+                stop = (
+                    re_test["Low"] - STOP_BUFFER if breakout_up else re_test["High"] + STOP_BUFFER
+                )
+                risk = abs(entry - stop)
+                target = entry + REWARD_RISK * risk if breakout_up else entry - REWARD_RISK * risk
+                signals.append(
+                    {
+                        "direction": "long" if breakout_up else "short",
+                        "entry": entry,
+                        "stop": stop,
+                        "target": target,
+                        "risk": risk,
+                        "vol_breakout": row["Volume"],
+                        "vol_retest": re_test["Volume"],
+                        "vol_ignition": ign["Volume"],
+                        "datetime": ign["Datetime"],
+                        "level": lvl_high if breakout_up else lvl_low,
+                    }
                 )
-                if ignition:
-                    entry = ign["High"] if breakout_up else ign["Low"]
-                    stop = re_test["Low"] - 0.05 if breakout_up else re_test["High"] + 0.05
-                    risk = abs(entry - stop)
-                    target = entry + 2 * risk if breakout_up else entry - 2 * risk
-                    signals.append(
-                        {
-                            "direction": "long" if breakout_up else "short",
-                            "entry": entry,
-                            "stop": stop,
-                            "target": target,
-                            "risk": risk,
-                            "vol_breakout": row["Volume"],
-                            "vol_retest": re_test["Volume"],
-                            "vol_ignition": ign["Volume"],
-                            "datetime": ign["Datetime"],
-                            "level": lvl_high if breakout_up else lvl_low,
-                        }
-                    )
     return signals, scan_df
 
 
@@ -389,8 +429,3 @@ if __name__ == "__main__":
                     print(f"{ticker}: Failed to save signals: {e}")
         except Exception as e:
             print(f"{ticker}: Unexpected error during scan: {e}")
-
-if __name__ == "__main__":
-    print("\n=== 5-Min Break & Re-Test Scalp Strategy Scanner ===\n")
-    for ticker in TICKERS:
-        scan_ticker(ticker)
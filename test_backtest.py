@@ -4,13 +4,14 @@ Test suite for backtesting functionality
 """
 
 import shutil
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
 import pandas as pd
 import pytest
 
-from backtest import BacktestEngine, DataCache
+from backtest import BacktestEngine, DataCache, run_symbol_backtest
 
 
 @pytest.fixture
@@ -24,9 +25,9 @@ def temp_cache_dir(tmp_path):
         shutil.rmtree(cache_dir)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_ohlcv_data_5m():
-    """Generate sample 5-minute OHLCV data for testing"""
+    """Generate sample 5-minute OHLCV data for testing (built once, treated as read-only)"""
     times = pd.date_range("2024-01-01 09:30", periods=20, freq="5min")
     data = []
 
@@ -76,9 +77,9 @@ def sample_ohlcv_data_5m():
     return pd.DataFrame(data)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_ohlcv_data_1m():
-    """Generate sample 1-minute OHLCV data for testing (aligned with 5m data)"""
+    """Generate sample 1-minute OHLCV data for testing (aligned with 5m data, read-only)"""
     times = pd.date_range("2024-01-01 09:30", periods=100, freq="1min")
     data = []
 
@@ -172,6 +173,25 @@ def test_data_cache_save_and_load(temp_cache_dir, sample_ohlcv_data_5m):
     assert list(loaded_df.columns) == list(sample_ohlcv_data_5m.columns)
 
 
+def test_data_cache_miss_is_read_only(temp_cache_dir):
+    """Test that looking up uncached data does not create symbol directories"""
+    cache = DataCache(temp_cache_dir)
+
+    assert cache.get_cached_data("AAPL", "2024-01-01", "5m") is None
+    assert not (Path(temp_cache_dir) / "AAPL").exists()
+
+
+def test_download_without_yfinance_raises(temp_cache_dir, monkeypatch):
+    """Test that a missing yfinance install raises instead of yielding empty data"""
+    monkeypatch.setitem(sys.modules, "yfinance", None)
+    cache = DataCache(temp_cache_dir)
+
+    with pytest.raises(ImportError):
+        cache.download_data("AAPL", "2024-01-01", "2024-01-02")
+    with pytest.raises(ImportError):
+        cache.download_data("AAPL", "2024-01-01", "2024-01-02", interval="1m")
+
+
 def test_backtest_engine_initialization():
     """Test BacktestEngine initialization"""
     engine = BacktestEngine(initial_capital=10000, position_size_pct=0.1)
@@ -286,5 +306,18 @@ def test_multitimeframe_breakout_detection(sample_ohlcv_data_5m, sample_ohlcv_da
             assert signal["target"] < signal["entry"] < signal["stop"]
 
 
+def test_run_symbol_backtest_from_cache(temp_cache_dir, sample_ohlcv_data_5m, sample_ohlcv_data_1m):
+    """Test single-symbol backtest (worker entry point) runs from cached data"""
+    cache = DataCache(temp_cache_dir)
+    cache.cache_data("TEST", "2024-01-01", "5m", sample_ohlcv_data_5m)
+    cache.cache_data("TEST", "2024-01-01", "1m", sample_ohlcv_data_1m)
+
+    result = run_symbol_backtest("TEST", "2024-01-01", "2024-01-01", cache_dir=temp_cache_dir)
+
+    assert result is not None
+    assert result["symbol"] == "TEST"
+    assert len(result["signals"]) >= 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -11,7 +11,13 @@ project_root = str(Path(__file__).parent.absolute())
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from break_and_retest_strategy import is_strong_body, scan_ticker
+import break_and_retest_strategy
+from break_and_retest_strategy import (
+    detect_breakouts,
+    is_strong_body,
+    scan_dataframe,
+    scan_ticker,
+)
 from visualize_results import create_chart
 
 
@@ -358,15 +364,6 @@ def make_test_df_long_fail():
     return df
 
 
-def test_long_break_and_retest_failure_setup():
-    df = make_test_df_long_fail()
-    signals = scan_ticker_test(df)
-    assert len(signals) == 0, "Should NOT detect long setup due to failed tight candle"
-
-    # Save visualization if SHOW_TEST env var is set
-    save_test_visualization("test_long_fail", df, signals)
-
-
 # --- Short break and re-test failure setup ---
 def make_test_df_short_fail():
     times = pd.date_range("2025-10-31 09:30", periods=20, freq="5min")
@@ -438,10 +435,96 @@ def make_test_df_short_fail():
     return df
 
 
-def test_short_break_and_retest_failure_setup():
-    df = make_test_df_short_fail()
+# --- Failure setups (re-test candle not tight enough) ---
+@pytest.mark.parametrize(
+    "make_df, direction",
+    [(make_test_df_long_fail, "long"), (make_test_df_short_fail, "short")],
+    ids=["long", "short"],
+)
+def test_break_and_retest_failure_setup(make_df, direction):
+    df = make_df()
     signals = scan_ticker_test(df)
-    assert len(signals) == 0, "Should NOT detect short setup due to failed tight candle"
+    assert len(signals) == 0, f"Should NOT detect {direction} setup due to failed tight candle"
 
     # Save visualization if SHOW_TEST env var is set
-    save_test_visualization("test_short_fail", df, signals)
+    save_test_visualization(f"test_{direction}_fail", df, signals)
+
+
+# --- Vectorized breakout detection ---
+@pytest.mark.parametrize(
+    "make_df, direction",
+    [(make_test_df, "long"), (make_test_df_short, "short")],
+    ids=["long", "short"],
+)
+def test_detect_breakouts_flags_breakout_candles(make_df, direction):
+    df = make_df()
+    df["vol_ma"] = df["Volume"].rolling(window=10, min_periods=1).mean()
+    breakouts_up, breakouts_down = detect_breakouts(df, df.iloc[0]["High"], df.iloc[0]["Low"])
+    flagged, other = (
+        (breakouts_up, breakouts_down) if direction == "long" else (breakouts_down, breakouts_up)
+    )
+    assert list(flagged.nonzero()[0]) == [3], "Breakout candle should be flagged"
+    assert not other.any()
+
+
+def test_detect_breakouts_tail_and_volume_factor_options():
+    # Truncate so the breakout candle is the second-to-last bar
+    df = make_test_df().iloc[:5].copy()
+    df["vol_ma"] = df["Volume"].rolling(window=10, min_periods=1).mean()
+    lvl_high, lvl_low = df.iloc[0]["High"], df.iloc[0]["Low"]
+
+    breakouts_up, _ = detect_breakouts(df, lvl_high, lvl_low)
+    assert not breakouts_up.any(), "No room for re-test and ignition on the same timeframe"
+
+    breakouts_up, _ = detect_breakouts(df, lvl_high, lvl_low, exclude_tail=False)
+    assert list(breakouts_up.nonzero()[0]) == [3]
+
+    breakouts_up, _ = detect_breakouts(
+        df, lvl_high, lvl_low, volume_factor=100.0, exclude_tail=False
+    )
+    assert not breakouts_up.any(), "Volume factor should gate the breakout"
+
+
+# --- Real scanner (scan_dataframe) on the scenario builders ---
+@pytest.mark.parametrize(
+    "make_df, direction, level, entry, stop, target",
+    [
+        (make_test_df, "long", 102.0, 103.0, 101.95, 105.1),
+        (make_test_df_short, "short", 99.0, 98.5, 99.05, 97.4),
+    ],
+    ids=["long", "short"],
+)
+def test_scan_dataframe_detects_valid_setup(make_df, direction, level, entry, stop, target):
+    signals, scan_df = scan_dataframe(make_df())
+    assert len(signals) == 1, f"Should detect one valid {direction} setup"
+    sig = signals[0]
+    assert sig["direction"] == direction
+    assert sig["level"] == pytest.approx(level)
+    assert sig["entry"] == pytest.approx(entry)
+    assert sig["stop"] == pytest.approx(stop)
+    assert sig["target"] == pytest.approx(target)
+    # Ignition is the bar two after the breakout candle (bar 3)
+    assert sig["datetime"] == scan_df["Datetime"].iloc[5]
+
+
+@pytest.mark.parametrize(
+    "make_df", [make_test_df_long_fail, make_test_df_short_fail], ids=["long", "short"]
+)
+def test_scan_dataframe_rejects_failure_setup(make_df):
+    signals, _ = scan_dataframe(make_df())
+    assert signals == []
+
+
+def test_scan_ticker_honours_market_open_minutes(monkeypatch, capsys):
+    monkeypatch.setattr(
+        break_and_retest_strategy, "get_intraday_data", lambda ticker, **kwargs: make_test_df()
+    )
+
+    signals, scan_df = scan_ticker("TEST")
+    assert len(signals) == 1, "Default window should find the long setup"
+
+    # 20 minutes after the open is only four 5-min bars: too few to scan
+    signals, scan_df = scan_ticker("TEST", market_open_minutes=20)
+    assert signals == []
+    assert len(scan_df) == 4
+    assert "Not enough data in first 20 min" in capsys.readouterr().out
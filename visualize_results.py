@@ -13,15 +13,20 @@ entry/stop/target and opening range.
 
 import argparse
 import os
+import re
 import webbrowser
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 from break_and_retest_strategy import scan_dataframe, scan_ticker
 
+# Timestamp embedded in test output filenames: test_<name>_YYYYMMDD_HHMMSS.html
+TEST_FILE_TIMESTAMP_RE = re.compile(r"_(?P<stamp>\d{8}_\d{6})")
+
 
 def create_chart(
     df: pd.DataFrame, signals: list, output_file: str = None, title: str = "Break & Re-Test"
@@ -71,7 +76,7 @@ def create_chart(
     )
 
     # Volume
-    colors = ["green" if c >= o else "red" for o, c in zip(df["Open"], df["Close"])]
+    colors = np.where(df["Close"].to_numpy() >= df["Open"].to_numpy(), "green", "red")
     fig.add_trace(
         go.Bar(x=df.index, y=df["Volume"], marker_color=colors, name="Volume", opacity=0.5),
         row=2,
@@ -142,24 +147,15 @@ def create_chart(
     return fig
 
 
-def find_latest_html(pattern="test_*.html"):
-    """Find the latest HTML file in logs directory matching the given pattern."""
+def scan_html_files(prefix):
+    """Return {path: mtime} for HTML files in logs directory starting with prefix."""
     os.makedirs("logs", exist_ok=True)
-    matching_files = []
-    for entry in os.scandir("logs"):
-        if not entry.is_file() or not entry.name.endswith(".html"):
-            continue
-
-        # Match test output files (test_long_valid, test_short_valid, etc)
-        if pattern == "test_*.html" and entry.name.startswith("test_"):
-            matching_files.append(entry.path)
-        # Match demo files if specified
-        elif entry.name.startswith(pattern.replace("*", "")):
-            matching_files.append(entry.path)
-
-    if not matching_files:
-        return None
-    return max(matching_files, key=os.path.getmtime)
+    files = {}
+    with os.scandir("logs") as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(".html") and entry.name.startswith(prefix):
+                files[entry.path] = entry.stat().st_mtime
+    return files
 
 
 def make_test_df():
@@ -454,35 +450,27 @@ def main():
     # Check for --show-test first
     if args.show_test:
         # Find the latest test output HTML
-        latest_html = find_latest_html("test_*.html")
+        # Scan logs/ once; the latest file and its minute-group both come from this listing
+        test_files = scan_html_files("test_")
+        latest_html = max(test_files, key=test_files.get) if test_files else None
         if latest_html:
             try:
                 # Extract minute-level key from filename timestamp (YYYYMMDD_HHMM)
-                # Expect filenames like: test_<name>_YYYYMMDD_HHMMSS.html
-                import re
-
-                m = re.search(r"_(\d{8}_\d{6})", os.path.basename(latest_html))
+                m = TEST_FILE_TIMESTAMP_RE.search(os.path.basename(latest_html))
                 minute_key = None
                 if m:
-                    datetime_str = m.group(1)  # e.g. 20251031_101818
+                    datetime_str = m.group("stamp")  # e.g. 20251031_101818
                     # e.g. 20251031_1018 (to the minute)
                     minute_key = datetime_str[:13]
 
                 # Collect all test files that share the same minute key
                 # (or fall back to all test files)
                 matched = []
-                all_test_files = []
-                for entry in os.scandir("logs"):
-                    if not entry.is_file() or not entry.name.endswith(".html"):
-                        continue
-                    if not entry.name.startswith("test_"):
-                        continue
-                    all_test_files.append(entry.path)
-                    if minute_key and minute_key in entry.name:
-                        matched.append(entry.path)
+                if minute_key:
+                    matched = [f for f in test_files if minute_key in os.path.basename(f)]
 
                 # If we found a minute-group, use it; otherwise fall back to all
-                files_to_show = matched if matched else all_test_files
+                files_to_show = matched if matched else list(test_files)
 
                 if not files_to_show:
                     print(
@@ -493,7 +481,7 @@ def main():
                     return
 
                 # Print the list of files to show
-                files_to_show = sorted(files_to_show, key=os.path.getmtime)
+                files_to_show = sorted(files_to_show, key=test_files.get)
                 latest_in_group = files_to_show[-1]
                 print(f"Latest test output: {latest_in_group}")
 